@@ -2,7 +2,11 @@
 # HTTPException to handle errors
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+# ORJSONResponse serializes with orjson (C extension) instead of the stdlib json module
+from fastapi.responses import ORJSONResponse, Response
+import orjson
+# Route to mount an endpoint directly on the Starlette router
+from starlette.routing import Route
 
 # Pydantic BaseModel to define the data models and validate the data
 from pydantic import BaseModel, Field
@@ -10,16 +14,74 @@ from pydantic import BaseModel, Field
 # List to define a list of items for fields in Pydantic models.
 from typing import List
 
-# uuid to generate unique IDs for receipts
-from uuid import uuid4
+# os and threading to generate receipt IDs from a shared random pool
+import os
+import threading
 
-from datetime import datetime
+from datetime import date
 import math
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # In-memory database to store the receipts and their points
-receipts_db = {}
+# Each entry holds the already-serialized JSON body of the points response,
+# so reads send it as is instead of re-encoding it on every GET.
+# Keyed by the canonical receipt ID string, so a GET is a single dict lookup on the path
+# string and any other spelling of an ID simply misses.
+# Split into shards picked by the ID's string hash. With the GIL and the single asyncio
+# loop the handlers run on, one dict never sees contention; the shards only spread
+# concurrent access across dicts on free-threaded builds.
+RECEIPT_SHARDS = 64
+receipts_db = [{} for _ in range(RECEIPT_SHARDS)]
+
+# Random bytes for receipt IDs, read from the OS in 64 KiB batches instead of
+# one urandom syscall per receipt. Each ID consumes the next 16 bytes.
+RANDOM_POOL_SIZE = 64 * 1024
+random_pool = b""
+random_pool_pos = 0
+random_pool_lock = threading.Lock()
+
+
+def reset_random_pool() -> None:
+    # A forked worker must not hand out the same bytes as its parent, and gets a fresh
+    # lock in case another thread held it at the moment of the fork
+    global random_pool, random_pool_pos, random_pool_lock
+    random_pool = b""
+    random_pool_pos = 0
+    random_pool_lock = threading.Lock()
+
+
+# os.register_at_fork only exists on POSIX; there is no fork to handle elsewhere
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_random_pool)
+
+
+# new_receipt_id returns a random (version 4) UUID in its canonical string form,
+# used both as the receipts_db key and as the ID returned to clients
+def new_receipt_id() -> str:
+    global random_pool, random_pool_pos
+    with random_pool_lock:
+        if random_pool_pos == len(random_pool):
+            random_pool = os.urandom(RANDOM_POOL_SIZE)
+            random_pool_pos = 0
+        raw = random_pool[random_pool_pos:random_pool_pos + 16]
+        random_pool_pos += 16
+
+    # Set the version and variant bits the same way uuid.uuid4() does
+    value = int.from_bytes(raw, "big")
+    value = (value & ~(0xf000 << 64)) | (4 << 76)
+    value = (value & ~(0xc000 << 48)) | (0x8000 << 48)
+
+    hex_id = f"{value:032x}"
+    return f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}"
+
+
+# Rule 1 lookup: every ASCII byte that is not a letter or digit
+NON_ALNUM_ASCII = bytes(i for i in range(128) if not chr(i).isalnum())
+
+# Rule 7 time window (2:00pm - 4:00pm) in minutes since midnight
+BONUS_WINDOW_START = 14 * 60
+BONUS_WINDOW_END = 16 * 60
 
 
 # Pydantic models
@@ -44,11 +106,13 @@ class Receipt(BaseModel):
     )
     purchaseDate: str = Field(
         ..., 
-        description="Date of purchase in YYYY-MM-DD format"
+        description="Date of purchase in YYYY-MM-DD format",
+        pattern=r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])$"
     )
     purchaseTime: str = Field(
         ..., 
-        description="Time of purchase in HH:MM format"
+        description="Time of purchase in HH:MM format",
+        pattern=r"^([01]\d|2[0-3]):[0-5]\d$"
     )
     items: List[Item] = Field(
         ..., 
@@ -61,20 +125,32 @@ class Receipt(BaseModel):
         pattern=r"^\d+\.\d{2}$"
     )
 
+# to_cents converts a validated USD amount string (digits, a dot and exactly two decimals) to whole cents
+# Dropping the dot leaves the amount in cents, so this is a single integer parse
+def to_cents(amount: str) -> int:
+    return int(amount.replace(".", "", 1))
+
+
 # calculate_points takes a Receipt object as input and returns an integer representing the points
-# async def: function is asynchronous and can be used with await
-async def calculate_points(receipt: Receipt) -> int:
+# It is pure CPU work with no I/O, so it is a plain function rather than a coroutine
+def calculate_points(receipt: Receipt) -> int:
     points = 0
 
     # Rule 1: One point for every alphanumeric character in the retailer name
-    points += sum(char.isalnum() for char in receipt.retailer)
+    # ASCII names are counted in C by deleting every non-alphanumeric byte
+    if receipt.retailer.isascii():
+        points += len(receipt.retailer.encode("ascii").translate(None, NON_ALNUM_ASCII))
+    else:
+        points += sum(char.isalnum() for char in receipt.retailer)
+
+    total_cents = to_cents(receipt.total)
 
     # Rule 2: 50 points if the total is a round dollar amount with no cents
-    if float(receipt.total).is_integer():
+    if total_cents % 100 == 0:
         points += 50
 
     # Rule 3: 25 points if the total is a multiple of 0.25
-    if float(receipt.total) % 0.25 == 0:
+    if total_cents % 25 == 0:
         points += 25
 
     # Rule 4: 5 points for every two items
@@ -87,50 +163,91 @@ async def calculate_points(receipt: Receipt) -> int:
             points += math.ceil(float(item.price) * 0.2)
 
     # Rule 6: 6 points if the day in the purchase date is odd
-    purchase_date = datetime.strptime(receipt.purchaseDate, "%Y-%m-%d")
-    if purchase_date.day % 2 != 0:
+    # purchaseDate is YYYY-MM-DD, so the day is always at [8:10]
+    if int(receipt.purchaseDate[8:10]) % 2 != 0:
         points += 6
 
     # Rule 7: 10 points if the time is after 2:00pm and before 4:00pm
-    purchase_time = datetime.strptime(receipt.purchaseTime, "%H:%M").time()
-    if purchase_time >= datetime.strptime("14:00", "%H:%M").time() and purchase_time <= datetime.strptime("16:00", "%H:%M").time():
+    # purchaseTime is HH:MM, compared as minutes since midnight
+    purchase_minutes = int(receipt.purchaseTime[0:2]) * 60 + int(receipt.purchaseTime[3:5])
+    if BONUS_WINDOW_START <= purchase_minutes <= BONUS_WINDOW_END:
         points += 10
 
     return points
 
 
+# Receipt's compiled pydantic-core validator, built once when the model class is created.
+# process_receipt feeds it the raw request bytes so JSON parsing and validation both happen
+# in a single pass in Rust, instead of FastAPI decoding the body and re-validating it per call.
+receipt_validator = Receipt.__pydantic_validator__
+
+# OpenAPI schema for the request body, with Item inlined so /docs still shows the full receipt.
+# The inlining only handles Item; a new nested model has to be inlined here too, or its
+# "#/$defs/..." reference would dangle in the OpenAPI document
+receipt_schema = Receipt.model_json_schema()
+receipt_schema["properties"]["items"]["items"] = receipt_schema.pop("$defs")["Item"]
+
+
+# is_json_content_type mirrors FastAPI's body parsing: a missing Content-Type, application/json
+# and application/*+json are read as JSON; anything else is not a JSON receipt
+def is_json_content_type(content_type: str | None) -> bool:
+    if not content_type:
+        return True
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or (
+        media_type.startswith("application/") and media_type.endswith("+json")
+    )
+
+
 # process_receipt: processes a receipt and returns the receipt ID
-# It takes a Receipt object as input and returns a dictionary with the receipt ID
-@app.post("/receipts/process")
-async def process_receipt(receipt: Receipt):
+# It reads the raw request body, validates it into a Receipt object and returns a dictionary with the receipt ID
+@app.post(
+    "/receipts/process",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": receipt_schema}},
+        }
+    },
+)
+async def process_receipt(request: Request):
     try:
-        # Validate date format
-        datetime.strptime(receipt.purchaseDate, "%Y-%m-%d")
-        
-        # Validate time format
-        datetime.strptime(receipt.purchaseTime, "%H:%M")
-        
-        # Convert prices from string to float for calculations
-        total = float(receipt.total)
-        items_total = sum(float(item.price) for item in receipt.items)
+        # Only JSON bodies are receipts
+        if not is_json_content_type(request.headers.get("content-type")):
+            raise HTTPException(
+                status_code=400,
+                detail="The receipt is invalid."
+            )
+
+        # Parse and validate the JSON body (ValidationError is a ValueError, handled below)
+        receipt = receipt_validator.validate_json(await request.body())
+
+        # Date and time formats are enforced by the model patterns; this only rejects
+        # days that do not exist in the month, like 2022-02-30
+        date.fromisoformat(receipt.purchaseDate)
+
+        # Convert prices from string to whole cents so the sum is exact
+        total_cents = to_cents(receipt.total)
+        items_cents = sum(to_cents(item.price) for item in receipt.items)
         
-        # Validate total matches sum of items (allowing for small float precision differences)
-        if abs(total - items_total) > 0.01:
+        # Validate total matches sum of items
+        if total_cents != items_cents:
             raise HTTPException(
                 status_code=400, 
                 detail="The receipt is invalid."
             )
 
         # Generate a unique ID for the receipt
-        receipt_id = str(uuid4())
+        receipt_id = new_receipt_id()
 
         # Calculate the points for the receipt
-        points = await calculate_points(receipt)
+        points = calculate_points(receipt)
 
-        # Store the points in the receipts_db dictionary
-        receipts_db[receipt_id] = points
+        # Store the serialized points response in the receipts_db shard for this ID
+        receipts_db[hash(receipt_id) % RECEIPT_SHARDS][receipt_id] = orjson.dumps({"points": points})
 
-        return {"id": receipt_id}
+        # Returning the response directly skips FastAPI's jsonable_encoder pass
+        return ORJSONResponse({"id": receipt_id})
         
     except ValueError as e:
         raise HTTPException(
@@ -139,32 +256,87 @@ async def process_receipt(receipt: Receipt):
         )
 
 
-# get_points is an endpoint that returns the points for a receipt
-# It takes a receipt ID as input and returns a dictionary with the points
-# The receipt ID is used to retrieve the points from the receipts_db dictionary
-@app.get("/receipts/{id}/points")
-async def get_points(id: str):
-    # Check if the receipt ID is in the receipts_db dictionary
-    if id not in receipts_db:
+# get_points is the endpoint that returns the points for a receipt
+# It takes a receipt ID from the path and returns the stored JSON body with the points
+# The receipt ID is used to retrieve the points from the receipts_db shards
+# It is mounted as a plain Starlette route rather than a FastAPI one, so GETs skip
+# FastAPI's per-request dependency solving and read the ID straight from the path
+async def get_points(request: Request):
+    id = request.path_params["id"]
+
+    # Look the receipt ID up in its receipts_db shard; only the exact ID string
+    # process_receipt returned is stored, so aliases and non-UUIDs miss
+    body = receipts_db[hash(id) % RECEIPT_SHARDS].get(id)
+    if body is None:
         raise HTTPException(status_code=404, detail="No receipt found for that ID.")
     
-    return {"points": receipts_db[id]}
+    return Response(body, media_type="application/json")
+
+
+app.router.routes.insert(0, Route("/receipts/{id}/points", get_points, methods=["GET"]))
+
+# OpenAPI entry for get_points; FastAPI only documents its own routes, so the raw route
+# is added to the generated schema below to keep it in /docs
+get_points_openapi = {
+    "get": {
+        "summary": "Get Points",
+        "operationId": "get_points_receipts__id__points_get",
+        "parameters": [
+            {
+                "name": "id",
+                "in": "path",
+                "required": True,
+                "description": "The receipt ID returned by POST /receipts/process",
+                "schema": {"type": "string", "title": "Id"},
+            }
+        ],
+        "responses": {
+            "200": {
+                "description": "The number of points awarded.",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {"points": {"type": "integer"}},
+                            "required": ["points"],
+                        }
+                    }
+                },
+            },
+            "404": {"description": "No receipt found for that ID."},
+        },
+    }
+}
+
+fastapi_openapi = app.openapi
+
+
+def openapi() -> dict:
+    # FastAPI caches the schema on app.openapi_schema after the first call
+    if app.openapi_schema is None:
+        fastapi_openapi()["paths"]["/receipts/{id}/points"] = get_points_openapi
+    return app.openapi_schema
+
+
+app.openapi = openapi
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=400,
         content={"detail": "The receipt is invalid."}
     )
 
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     if exc.status_code == 404:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"detail": "No receipt found for that ID."}
         )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail}
     )
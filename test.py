@@ -1,7 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
-from main import app
-from uuid import uuid4
+from main import app, get_points
+from uuid import UUID, uuid4
 
 client = TestClient(app)
 
@@ -30,6 +30,10 @@ def test_process_receipt():
     receipt_id = response.json()["id"]
     assert isinstance(receipt_id, str)
     assert len(receipt_id) > 0
+
+    # Check if the receipt_id is a canonical random (version 4) UUID
+    assert str(UUID(receipt_id)) == receipt_id
+    assert UUID(receipt_id).version == 4
     
     # Check if the points are calculated and being returned
     points_response = client.get(f"/receipts/{receipt_id}/points")
@@ -94,6 +98,78 @@ def test_get_points_target():
     assert points_response.json()["points"] == 28
 
 
+# Test if non-ASCII letters in the retailer name count as alphanumeric characters
+def test_get_points_non_ascii_retailer():
+    receipt = {
+        "retailer": "Café",
+        "purchaseDate": "2022-03-20",
+        "purchaseTime": "13:00",
+        "items": [
+            {"shortDescription": "Item", "price": "5.00"}
+        ],
+        "total": "5.00"
+    }
+    process_response = client.post("/receipts/process", json=receipt)
+    receipt_id = process_response.json()["id"]
+
+    points_response = client.get(f"/receipts/{receipt_id}/points")
+    assert points_response.status_code == 200
+    # 4 (retailer) + 50 (round dollar) + 25 (multiple of 0.25)
+    assert points_response.json()["points"] == 79
+
+
+# Test the inclusive 2:00pm-4:00pm bounds of the time rule and the odd/even day rule
+# Base points: 6 (retailer) + 50 (round dollar) + 25 (multiple of 0.25) = 81
+@pytest.mark.parametrize("purchase_date, purchase_time, expected_points", [
+    ("2022-03-20", "13:59", 81),  # Just before the window
+    ("2022-03-20", "14:00", 91),  # Start of the window is included
+    ("2022-03-20", "16:00", 91),  # End of the window is included
+    ("2022-03-20", "16:01", 81),  # Just after the window
+    ("2022-03-21", "13:00", 87),  # Odd day
+    ("2022-03-20", "13:00", 81),  # Even day
+])
+def test_get_points_time_window_and_day(purchase_date, purchase_time, expected_points):
+    receipt = {
+        "retailer": "Target",
+        "purchaseDate": purchase_date,
+        "purchaseTime": purchase_time,
+        "items": [
+            {"shortDescription": "Item", "price": "5.00"}
+        ],
+        "total": "5.00"
+    }
+    process_response = client.post("/receipts/process", json=receipt)
+    receipt_id = process_response.json()["id"]
+
+    points_response = client.get(f"/receipts/{receipt_id}/points")
+    assert points_response.status_code == 200
+    assert points_response.json()["points"] == expected_points
+
+
+# Test if the points endpoint is served by the single raw get_points route
+def test_points_route_is_raw_get_points():
+    routes = [route for route in app.routes if route.path == "/receipts/{id}/points"]
+    assert len(routes) == 1
+    assert routes[0].endpoint is get_points
+
+
+# Test if both endpoints are documented in the OpenAPI schema used by /docs
+def test_openapi_documents_endpoints():
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    paths = response.json()["paths"]
+    assert "post" in paths["/receipts/process"]
+    assert "get" in paths["/receipts/{id}/points"]
+    assert paths["/receipts/{id}/points"]["get"]["parameters"][0]["name"] == "id"
+
+
+# Test if the inlined receipt schema leaves no dangling $defs references in /docs
+def test_openapi_has_no_dangling_defs_refs():
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert '"#/$defs/' not in response.text
+
+
 class TestReceiptErrors:
     def test_receipt_not_found_basic(self):
         # Test basic case of non-existent receipt ID using a valid UUID format
@@ -117,6 +193,28 @@ class TestReceiptErrors:
         assert response.status_code == 400
         assert response.json()["detail"] == "The receipt is invalid."
 
+    def test_malformed_json_body(self):
+        # Test a request body that is not valid JSON
+        response = client.post(
+            "/receipts/process",
+            content=b'{"retailer": "Target",',
+            headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "The receipt is invalid."
+
+    @pytest.mark.parametrize("content_type", ["text/plain", "application/x-www-form-urlencoded"])
+    def test_non_json_content_type(self, content_type):
+        # Test a valid receipt sent with a non-JSON Content-Type
+        response = client.post(
+            "/receipts/process",
+            content=b'{"retailer": "Target", "purchaseDate": "2022-01-01", "purchaseTime": "13:01", '
+                    b'"items": [{"shortDescription": "Mountain Dew 12PK", "price": "6.49"}], "total": "6.49"}',
+            headers={"Content-Type": content_type}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "The receipt is invalid."
+
     @pytest.mark.parametrize("invalid_receipt", [
         {  # Missing required fields
             "retailer": "Test Store"
@@ -128,6 +226,13 @@ class TestReceiptErrors:
             "items": [{"shortDescription": "Item", "price": "5.00"}],
             "total": "5.00"
         },
+        {  # Day that does not exist in the month
+            "retailer": "Test Store",
+            "purchaseDate": "2022-02-30",
+            "purchaseTime": "14:33",
+            "items": [{"shortDescription": "Item", "price": "5.00"}],
+            "total": "5.00"
+        },
         {  # Invalid price format
             "retailer": "Test Store",
             "purchaseDate": "2022-03-20",
@@ -142,6 +247,20 @@ class TestReceiptErrors:
             "items": [{"shortDescription": "Item", "price": "5.00"}],
             "total": "5.00"
         },
+        {  # Hour out of range
+            "retailer": "Test Store",
+            "purchaseDate": "2022-03-20",
+            "purchaseTime": "24:00",
+            "items": [{"shortDescription": "Item", "price": "5.00"}],
+            "total": "5.00"
+        },
+        {  # Total does not match the sum of item prices
+            "retailer": "Test Store",
+            "purchaseDate": "2022-03-20",
+            "purchaseTime": "14:33",
+            "items": [{"shortDescription": "Item", "price": "5.00"}],
+            "total": "5.01"
+        },
         {  # Empty items list
             "retailer": "Test Store",
             "purchaseDate": "2022-03-20",
@@ -157,6 +276,28 @@ class TestReceiptErrors:
         assert response.status_code == 400
         assert response.json()["detail"] == "The receipt is invalid."
 
+    @pytest.mark.parametrize("alias", [
+        lambda receipt_id: receipt_id.upper(),
+        lambda receipt_id: receipt_id.replace("-", ""),
+        lambda receipt_id: "{" + receipt_id + "}",
+        lambda receipt_id: "urn:uuid:" + receipt_id
+    ])
+    def test_receipt_id_aliases_not_found(self, alias):
+        # Test that only the exact ID returned by the process endpoint finds the receipt
+        receipt = {
+            "retailer": "Target",
+            "purchaseDate": "2022-01-01",
+            "purchaseTime": "13:01",
+            "items": [{"shortDescription": "Mountain Dew 12PK", "price": "6.49"}],
+            "total": "6.49"
+        }
+        receipt_id = client.post("/receipts/process", json=receipt).json()["id"]
+        assert client.get(f"/receipts/{receipt_id}/points").status_code == 200
+
+        response = client.get(f"/receipts/{alias(receipt_id)}/points")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "No receipt found for that ID."
+
     @pytest.mark.parametrize("invalid_id", [
         str(uuid4()),  # Random valid UUID format
         "invalid-id",